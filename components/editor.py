@@ -3,6 +3,7 @@ import logging
 from utils.protocol_improver import ProtocolImprover
 from utils.gpt_handler import GPTHandler
 from utils.missing_information_handler import MissingInformationHandler
+from utils.protocol_text import format_section_title
 
 logger = logging.getLogger(__name__)
 
@@ -31,14 +32,17 @@ SHORTCUTS = {
     "toggle_details": {"key": "ctrl+d", "description": "Toggle field details"}
 }
 
+# Shared default for sections without analysis results; never mutated
+_EMPTY_ANALYSIS = {}
+
 def calculate_progress(sections_to_display, analysis_results, updated_sections):
     """Calculate overall completion progress"""
     total_sections = len(sections_to_display)
     completed_sections = 0
     
     for section in sections_to_display:
-        section_analysis = analysis_results.get(section, {})
-        missing_fields = section_analysis.get('missing_fields', [])
+        section_analysis = analysis_results.get(section, _EMPTY_ANALYSIS)
+        missing_fields = section_analysis.get('missing_fields', ())
         
         # Section is complete if all fields are updated
         is_complete = all(
@@ -220,7 +224,7 @@ def render_editor():
                     # Section header with severity indicators
                     header_cols = st.columns([3, 1, 1, 1])
                     with header_cols[0]:
-                        st.markdown(f"#### {section_name.replace('_', ' ').title()}")
+                        st.markdown(f"#### {format_section_title(section_name)}")
                     with header_cols[1]:
                         if analysis['severity_counts']['critical']:
                             st.error(f"🔴 Critical: {analysis['severity_counts']['critical']}")
@@ -290,9 +294,14 @@ def render_editor():
         
         # Display protocol sections
         st.markdown("### 📄 Protocol Sections")
-        for section_name in ordered_sections:
-            with st.expander(f"📄 {section_name.replace('_', ' ').title()}", expanded=False):
-                st.markdown(st.session_state.generated_sections[section_name])
+        # One viewer for the selected section instead of a widget per section
+        selected_section = st.selectbox(
+            "Section",
+            ordered_sections,
+            format_func=lambda name: f"📄 {format_section_title(name)}",
+            key="section_viewer"
+        )
+        st.markdown(st.session_state.generated_sections[selected_section])
                     
     except Exception as e:
         logger.error(f"Error in editor: {str(e)}")
@@ -6,6 +6,11 @@ from utils.protocol_improver import ProtocolImprover
 
 logger = logging.getLogger(__name__)
 
+@st.cache_data(show_spinner=False)
+def validate_synopsis_cached(synopsis_text: str) -> dict:
+    '''Validate synopsis once per distinct text across reruns'''
+    return SynopsisValidator().validate_synopsis(synopsis_text)
+
 def render_input_section():
     st.markdown("## Protocol Development")
     st.markdown("Please upload your study synopsis or enter text below.")
@@ -74,10 +79,9 @@ def render_input_section():
         
         with st.spinner("Analyzing synopsis..."):
             improver = ProtocolImprover()
-            validator = SynopsisValidator()
             
             # Validate study type first
-            validation_result = validator.validate_synopsis(synopsis_text)
+            validation_result = validate_synopsis_cached(synopsis_text)
             if validation_result and validation_result.get('study_type'):
                 study_type = validation_result['study_type']
                 st.success(f"📋 Detected Study Type: {study_type.replace('_', ' ').title()}")
@@ -1,15 +1,33 @@
 import streamlit as st
 import logging
 from utils.template_section_generator import TemplateSectionGenerator
-from io import BytesIO
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from utils.protocol_text import format_section_title
+from utils.document_export import EXPORT_BUILDERS, build_cached_artifact, sections_key
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import atexit
+import multiprocessing
 import time
-import re
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between progress redraws during generation
+PROGRESS_PUSH_INTERVAL = 0.25
+
+# Concurrent section generation requests sent to the API
+MAX_GENERATION_WORKERS = 6
+
+# Download formats: button label and MIME type per document kind
+EXPORT_FORMATS = {
+    'docx': ('📄 Download DOCX', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    'pdf': ('📑 Download PDF', 'application/pdf')
+}
+
+@st.cache_resource(show_spinner=False)
+def get_section_generator():
+    '''Shared generator; construction opens and tests the OpenAI client'''
+    return TemplateSectionGenerator()
+
 def render_navigator():
     '''Render the protocol navigation interface'''
     try:
@@ -37,194 +55,234 @@ def render_navigator():
                             study_config = COMPREHENSIVE_STUDY_CONFIGS.get(st.session_state.study_type, {})
                             required_sections = study_config.get('required_sections', [])
                             
-                            # Show progress for each section
-                            progress_text = st.sidebar.empty()
-                            progress_bar = st.sidebar.progress(0)
-                            
-                            # Generate protocol sections
-                            generator = TemplateSectionGenerator()
-                            result = {"sections": {}}
+                            generated, failed_sections = generate_sections(
+                                required_sections, dict(st.session_state.generated_sections)
+                            )
+                            if not generated:
+                                raise RuntimeError("no sections could be generated")
                             
-                            for idx, section_name in enumerate(required_sections):
-                                progress_text.text(f"Generating {section_name.replace('_', ' ').title()}...")
-                                progress = (idx + 1) / len(required_sections)
-                                progress_bar.progress(progress)
-                                
-                                section_content = generator.generate_section(
-                                    section_name=section_name,
-                                    synopsis_content=st.session_state.synopsis_content,
-                                    study_type=st.session_state.study_type
-                                )
-                                if section_content:
-                                    result["sections"][section_name] = section_content
-                            
-                            st.session_state.generated_sections = result["sections"]
-                            progress_bar.empty()
-                            progress_text.empty()
-                            st.success("✅ Protocol sections generated successfully!")
+                            st.session_state.generated_sections = generated
+                            st.session_state.failed_sections = failed_sections
+                            if failed_sections:
+                                st.warning(f"⚠️ {len(failed_sections)} section(s) could not be generated; retry them from the sidebar.")
+                            else:
+                                st.success("✅ Protocol sections generated successfully!")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error generating protocol: {str(e)}")
             else:
                 st.sidebar.markdown("### 📝 Generated Sections")
                 for section in st.session_state.generated_sections.keys():
-                    st.sidebar.markdown(f"✓ {section.replace('_', ' ').title()}")
+                    st.sidebar.markdown(f"✓ {format_section_title(section)}")
+                failed_sections = st.session_state.get('failed_sections', [])
+                for section in failed_sections:
+                    st.sidebar.markdown(f"⚠️ {format_section_title(section)} (generation failed)")
+                
+                if failed_sections:
+                    st.sidebar.warning(f"{len(failed_sections)} section(s) failed to generate.")
+                    if st.sidebar.button("🔁 Retry Failed Sections", use_container_width=True):
+                        with st.spinner("Retrying failed sections..."):
+                            from config.study_type_definitions import COMPREHENSIVE_STUDY_CONFIGS
+                            study_config = COMPREHENSIVE_STUDY_CONFIGS.get(st.session_state.study_type, {})
+                            section_order = list(study_config.get('required_sections', failed_sections))
+                            
+                            retried, still_failed = generate_sections(
+                                failed_sections, dict(st.session_state.generated_sections)
+                            )
+                            # Merge the retried sections back in the study type's section order
+                            merged = {**st.session_state.generated_sections, **retried}
+                            st.session_state.generated_sections = {
+                                section_name: merged[section_name]
+                                for section_name in [*section_order, *merged]
+                                if section_name in merged
+                            }
+                            st.session_state.failed_sections = still_failed
+                            st.rerun()
+
+                # Ask for a fresh draft of one section, bypassing the section cache
+                regenerate_section = st.sidebar.selectbox(
+                    "Regenerate section",
+                    list(st.session_state.generated_sections),
+                    format_func=format_section_title,
+                    key="regenerate_section"
+                )
+                if st.sidebar.button("🔄 Regenerate Section", use_container_width=True):
+                    with st.spinner(f"Regenerating {format_section_title(regenerate_section)}..."):
+                        try:
+                            st.session_state.generated_sections[regenerate_section] = get_section_generator().generate_section(
+                                section_name=regenerate_section,
+                                synopsis_content=st.session_state.synopsis_content,
+                                study_type=st.session_state.study_type,
+                                previous_sections=dict(st.session_state.generated_sections),
+                                use_cache=False
+                            )
+                            st.rerun()
+                        except Exception as e:
+                            st.sidebar.error(f"Error regenerating section: {str(e)}")
         
             # Add download options if sections are generated
             if generated_sections := st.session_state.get('generated_sections'):
                 st.sidebar.markdown('### 📥 Download Protocol')
                 
-                try:
-                    # Generate DOCX
-                    with st.spinner("Preparing document..."):
-                        docx_bytes = generate_docx(generated_sections)
-                    
-                    # Add download button
-                    st.sidebar.download_button(
-                        label='📄 Download DOCX',
-                        data=docx_bytes,
-                        file_name='protocol.docx',
-                        mime='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                        use_container_width=True
-                    )
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    logger.error(f'Error creating document: {error_msg}')
-                    st.sidebar.error(f'Error creating document: {error_msg}')
+                # Build documents only when the user asks for it, off the script thread;
+                # DOCX and PDF run in parallel on the export pool
+                export_key = sections_key(generated_sections)
+                if st.session_state.get('export_key') != export_key:
+                    # Prepared documents no longer match the sections
+                    st.session_state.export_bytes = {}
+                
+                if st.sidebar.button('Prepare Documents', use_container_width=True):
+                    ready = st.session_state.get('export_bytes', {})
+                    missing = [kind for kind in EXPORT_BUILDERS if kind not in ready]
+                    if missing:
+                        st.session_state.export_key = export_key
+                        st.session_state.export_futures = submit_export_builds(missing, dict(generated_sections))
+                
+                if st.session_state.get('export_futures'):
+                    with st.sidebar:
+                        poll_export_builds()
+                
+                for kind, error_msg in st.session_state.pop('export_errors', {}).items():
+                    logger.error('Error creating %s document: %s', kind, error_msg)
+                    st.sidebar.error(f'Error creating {kind.upper()} document: {error_msg}')
+                
+                # Add download buttons once the documents are ready
+                export_bytes = st.session_state.get('export_bytes', {})
+                for kind, (label, mime) in EXPORT_FORMATS.items():
+                    if data := export_bytes.get(kind):
+                        st.sidebar.download_button(
+                            label=label,
+                            data=data,
+                            file_name=f'protocol.{kind}',
+                            mime=mime,
+                            use_container_width=True,
+                            key=f'download_{kind}'
+                        )
     
     except Exception as e:
-        logger.error(f'Error in navigator: {str(e)}')
+        logger.error('Error in navigator: %s', e)
         st.error(f'An error occurred while rendering the navigator: {str(e)}')
 
-def generate_docx(sections):
-    '''Generate DOCX document with enhanced formatting'''
-    docx_bytes = BytesIO()
-    doc = Document()
-    
-    # Add title with proper encoding
-    title = doc.add_heading('Study Protocol', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Add date with proper encoding
-    date_para = doc.add_paragraph()
-    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    date_para.add_run(time.strftime("%B %d, %Y"))
-    
-    # Add table of contents
-    doc.add_heading('Table of Contents', level=1)
-    for section_name in sections.keys():
-        toc_para = doc.add_paragraph()
-        toc_para.add_run(f'• {section_name.replace("_", " ").title()}')
-    
-    doc.add_page_break()
+def generate_sections(section_names, previous_sections):
+    '''Generate sections concurrently with sidebar progress
+
+    Returns the generated sections and the names that failed, both in the
+    order of section_names regardless of completion order.
+    '''
+    # Show progress for each section
+    progress_text = st.sidebar.empty()
+    progress_bar = st.sidebar.progress(0)
     
-    # Add sections with proper encoding
-    for section_name, content in sections.items():
-        # Add section heading
-        doc.add_heading(section_name.replace('_', ' ').title(), level=1)
-        
-        # Process content with proper encoding
-        add_text_with_formatting(doc, content)
-        doc.add_page_break()
+    # Each call is an API round-trip, so run them concurrently
+    generator = get_section_generator()
+    last_push = 0.0
+    synopsis_content = st.session_state.synopsis_content
+    study_type = st.session_state.study_type
+    generated = {}
+    failed = set()
     
-    # Save document
-    doc.save(docx_bytes)
-    docx_bytes.seek(0)
-    return docx_bytes.getvalue()
-
-def add_text_with_formatting(doc, text):
-    '''Add text to document with proper encoding'''
-    try:
-        # Convert text to string if it's bytes
-        if isinstance(text, bytes):
-            text = text.decode('utf-8')
-        
-        # Replace special characters with ASCII equivalents
-        replacements = {
-            '"': '"',
-            '"': '"',
-            ''': "'",
-            ''': "'",
-            '•': '-',
-            '–': '-',
-            '—': '-',
-            '…': '...',
-            '°': ' degrees ',
-            '±': '+/-',
-            '×': 'x',
-            '÷': '/',
-            '≥': '>=',
-            '≤': '<=',
-            '≈': '~',
-            '≠': '!='
+    workers = max(1, min(MAX_GENERATION_WORKERS, len(section_names)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                generator.generate_section,
+                section_name=section_name,
+                synopsis_content=synopsis_content,
+                study_type=study_type,
+                previous_sections=previous_sections
+            ): section_name
+            for section_name in section_names
         }
-        for old, new in replacements.items():
-            text = text.replace(old, new)
         
-        # Handle HTML tables
-        if '<table' in text:
-            parts = text.split('<table')
+        for idx, future in enumerate(as_completed(futures)):
+            section_name = futures[future]
+            try:
+                generated[section_name] = future.result()
+            except Exception:
+                # Already logged by the generator; keep the other sections
+                failed.add(section_name)
             
-            # Add text before first table
-            if parts[0].strip():
-                add_paragraphs_with_formatting(doc, parts[0])
-            
-            # Process each table
-            for part in parts[1:]:
-                table_end = part.find('</table>')
-                if table_end != -1:
-                    table_html = '<table' + part[:table_end + 8]
-                    remaining_text = part[table_end + 8:]
-                    
-                    # Convert HTML table to Word table
-                    rows = re.findall(r'<tr>(.*?)</tr>', table_html, re.DOTALL)
-                    if rows:
-                        # Count columns from first row
-                        first_row_cells = re.findall(r'<t[hd]>(.*?)</t[hd]>', rows[0])
-                        table = doc.add_table(rows=len(rows), cols=len(first_row_cells))
-                        table.style = 'Table Grid'
-                        
-                        # Fill table
-                        for i, row in enumerate(rows):
-                            cells = re.findall(r'<t[hd]>(.*?)</t[hd]>', row)
-                            for j, cell_content in enumerate(cells):
-                                clean_content = cell_content.strip()
-                                # Replace special characters in table cells
-                                for old, new in replacements.items():
-                                    clean_content = clean_content.replace(old, new)
-                                table.cell(i, j).text = clean_content
-                                if i == 0:
-                                    table.cell(i, j).paragraphs[0].runs[0].bold = True
-                    
-                    # Add remaining text
-                    if remaining_text.strip():
-                        add_paragraphs_with_formatting(doc, remaining_text)
-        else:
-            add_paragraphs_with_formatting(doc, text)
-    except Exception as e:
-        logger.error(f"Error in add_text_with_formatting: {str(e)}")
-        raise
+            # Coalesce redraws so fast sections don't flood the frontend
+            now = time.monotonic()
+            if now - last_push > PROGRESS_PUSH_INTERVAL or idx == len(section_names) - 1:
+                progress_text.text(f"Generated {format_section_title(section_name)}...")
+                progress = (idx + 1) / len(section_names)
+                progress_bar.progress(progress)
+                last_push = now
+    
+    progress_bar.empty()
+    progress_text.empty()
+    
+    # Keep the study type's section order regardless of completion order
+    sections = {
+        section_name: generated[section_name]
+        for section_name in section_names
+        if generated.get(section_name)
+    }
+    failed_sections = [
+        section_name for section_name in section_names
+        if section_name in failed or section_name not in sections
+    ]
+    return sections, failed_sections
 
-def add_paragraphs_with_formatting(doc, text):
-    '''Add paragraphs with proper encoding'''
-    try:
-        # Convert text to string if it's bytes
-        if isinstance(text, bytes):
-            text = text.decode('utf-8')
-            
-        # Split into paragraphs
-        for para in text.split('\n'):
-            if para.strip():
-                p = doc.add_paragraph()
-                # Handle italic formatting
-                parts = para.split('*')
-                for i, part in enumerate(parts):
-                    if part.strip():
-                        run = p.add_run(part.strip())
-                        if i % 2:  # Odd indices are italic
-                            run.italic = True
-                        run.font.size = Pt(11)
-    except Exception as e:
-        logger.error(f"Error in add_paragraphs_with_formatting: {str(e)}")
-        raise
+@st.cache_resource(show_spinner=False)
+def get_export_executor():
+    '''Worker processes so document builds neither block the script thread nor share its GIL'''
+    # spawn rather than fork: the Streamlit server process is multi-threaded.
+    # Streamlit runs the page as __main__, so each spawned worker re-imports
+    # main.py (and with it Streamlit and the components) as __mp_main__; the
+    # __name__ guard in main.py is what keeps workers from rendering the app
+    executor = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+    atexit.register(executor.shutdown, wait=False, cancel_futures=True)
+    return executor
+
+def reset_export_executor(executor):
+    '''Drop a broken export pool so the next build starts fresh workers'''
+    executor.shutdown(wait=False, cancel_futures=True)
+    # Another session may already have replaced it
+    if get_export_executor() is executor:
+        get_export_executor.clear()
+
+def submit_export_builds(kinds, sections):
+    '''Submit document builds, replacing the pool once if a worker has died'''
+    # sections must be a plain dict so it pickles to the workers
+    for _ in range(2):
+        executor = get_export_executor()
+        try:
+            st.session_state.export_executor = executor
+            return {
+                kind: executor.submit(build_cached_artifact, kind, sections, EXPORT_BUILDERS[kind])
+                for kind in kinds
+            }
+        except BrokenProcessPool:
+            logger.warning('Export worker pool is broken; starting a new one')
+            reset_export_executor(executor)
+    raise RuntimeError('document export workers could not be started')
+
+@st.fragment(run_every=1.0)
+def poll_export_builds():
+    '''Wait for the background document builds without rerunning the whole page'''
+    futures = st.session_state.get('export_futures')
+    if not futures:
+        return
+    if not all(future.done() for future in futures.values()):
+        st.caption('⏳ Preparing documents...')
+        return
+    
+    export_bytes = st.session_state.setdefault('export_bytes', {})
+    errors = {}
+    pool_broken = False
+    for kind, future in futures.items():
+        try:
+            export_bytes[kind] = future.result()
+        except BrokenProcessPool:
+            # A worker died mid-build (e.g. out of memory); the pool is unusable now
+            pool_broken = True
+            errors[kind] = 'the export worker stopped unexpectedly, please prepare the documents again'
+        except Exception as e:
+            errors[kind] = str(e)
+    if pool_broken:
+        reset_export_executor(st.session_state.export_executor)
+    st.session_state.export_futures = None
+    st.session_state.export_errors = errors
+    st.rerun()
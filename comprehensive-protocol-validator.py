@@ -1,7 +1,12 @@
 # protocol_validator.py
 
+import copy
+import hashlib
+import json
+import re
+from collections import OrderedDict
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 class IssueType(Enum):
     # Content Issues
@@ -29,9 +34,25 @@ class IssueSeverity(Enum):
     MAJOR = "major"
     MINOR = "minor"
 
+# Rule severity names and the issue severity each one maps to
+RULE_SEVERITIES = (("critical", IssueSeverity.CRITICAL), ("major", IssueSeverity.MAJOR))
+
+# Number of recent validation results kept per validator
+RESULT_CACHE_SIZE = 32
+
 class ProtocolValidator:
     def __init__(self):
-        self.validation_rules = self._load_validation_rules()
+        # Rules do not depend on instance state, so they are built once per class
+        # and shared by every validator; treat them as read-only
+        cls = type(self)
+        if "_shared_rules" not in cls.__dict__:
+            cls._shared_rules = self._load_validation_rules()
+            cls._shared_language_rules = self._compile_language_rules(cls._shared_rules)
+            cls._shared_rule_index = self._index_study_rules(cls._shared_rules)
+        self.validation_rules = cls._shared_rules
+        self._language_pattern, self._language_terms = cls._shared_language_rules
+        self._rule_index = cls._shared_rule_index
+        self._result_cache = OrderedDict()
 
     def _load_validation_rules(self):
         return {
@@ -204,8 +225,15 @@ class ProtocolValidator:
 
     def validate_protocol(self, content: Dict, study_type: str) -> Dict:
         """Perform comprehensive protocol validation"""
+        # Unchanged protocols are common while editing, so reuse their results
+        cache_key = (study_type, self._content_digest(content))
+        if cache_key in self._result_cache:
+            self._result_cache.move_to_end(cache_key)
+            return copy.deepcopy(self._result_cache[cache_key])
+
         validation_results = {
             "issues": [],
+            "issues_by_severity": {severity: [] for severity in IssueSeverity},
             "warnings": [],
             "suggestions": [],
             "quality_score": 0.0
@@ -220,20 +248,27 @@ class ProtocolValidator:
         # 3. Language Validation
         self._validate_language(content, validation_results)
 
-        # 4. Compliance Validation
-        self._validate_compliance(content, study_type, validation_results)
-
         # Calculate overall quality score
         validation_results["quality_score"] = self._calculate_quality_score(validation_results)
 
+        self._result_cache[cache_key] = copy.deepcopy(validation_results)
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+
         return validation_results
 
+    @staticmethod
+    def _content_digest(content: Dict) -> bytes:
+        """Stable digest of the protocol content used as the result cache key"""
+        serialized = json.dumps(content, sort_keys=True).encode()
+        return hashlib.blake2b(serialized, digest_size=16).digest()
+
     def _validate_content(self, content: Dict, study_type: str, results: Dict):
         """Validate content completeness and consistency"""
         required = self.validation_rules["content"]["required_elements"].get(study_type, [])
         for element in required:
             if element not in content:
-                results["issues"].append({
+                self._add_issue(results, {
                     "type": IssueType.MISSING_ELEMENT,
                     "severity": IssueSeverity.CRITICAL,
                     "message": f"Missing required element: {element}",
@@ -243,44 +278,88 @@ class ProtocolValidator:
 
     def _validate_scientific_rigor(self, content: Dict, study_type: str, results: Dict):
         """Validate scientific methodology and rigor"""
-        study_rules = self.validation_rules["scientific"]["study_specific"].get(study_type, {})
+        rule_groups = self._rule_index.get(study_type)
+        if not rule_groups:
+            return
+        recommendations = self._get_validity_recommendations(study_type)
 
-        # Check internal validity
-        for severity in ["critical", "major"]:
-            for requirement in study_rules.get("internal_validity", {}).get(severity, []):
+        # Internal then external validity, critical before major
+        for validity_type, severity, requirements in rule_groups:
+            for requirement in requirements:
                 if not self._check_requirement(content, requirement):
-                    results["issues"].append(self._create_validity_issue(
-                        requirement, "internal", severity, study_type
+                    self._add_issue(results, self._create_validity_issue(
+                        requirement, validity_type, severity, recommendations
                     ))
 
-        # Check external validity
-        for severity in ["critical", "major"]:
-            for requirement in study_rules.get("external_validity", {}).get(severity, []):
-                if not self._check_requirement(content, requirement):
-                    results["issues"].append(self._create_validity_issue(
-                        requirement, "external", severity, study_type
-                    ))
+    def _index_study_rules(self, validation_rules: Dict) -> Dict[str, Tuple]:
+        """Flatten study-specific rules to (validity_type, severity, requirements) groups per study type"""
+        index = {}
+        for study_type, study_rules in validation_rules["scientific"]["study_specific"].items():
+            index[study_type] = tuple(
+                (validity_type, severity, tuple(requirements))
+                for validity_type in ("internal", "external")
+                for severity_name, severity in RULE_SEVERITIES
+                if (requirements := study_rules.get(f"{validity_type}_validity", {}).get(severity_name))
+            )
+        return index
+
+    def _compile_language_rules(self, validation_rules: Dict) -> Tuple[re.Pattern, Dict]:
+        """Compile all language terms into one pattern so each section is scanned once"""
+        rules = validation_rules["language"]
+        # Each term maps to its issue type and suggestion text
+        terms = {}
+        for term in rules["inappropriate_terms"]:
+            terms[term] = (IssueType.TONE, "Use formal scientific language")
+        for term, replacement in rules["informal_terms"].items():
+            terms[term] = (IssueType.FORMALITY, f"Replace with '{replacement}'")
+        # Precise terms carry advice rather than a substitute word
+        for term, advice in rules["precise_terms"].items():
+            terms[term] = (IssueType.CLARITY, f"'{term}': {advice}")
+
+        # Longest terms first so overlapping phrases match as a whole
+        alternation = "|".join(map(re.escape, sorted(terms, key=len, reverse=True)))
+        return re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE), terms
+
+    def _validate_language(self, content: Dict, results: Dict):
+        """Flag informal, imprecise or inappropriate wording"""
+        for section_name, section_content in content.items():
+            # One issue per term per section, in order of first occurrence
+            found = dict.fromkeys(
+                match.group().lower()
+                for match in self._language_pattern.finditer(section_content)
+            )
+            for term in found:
+                issue_type, suggestion = self._language_terms[term]
+                self._add_issue(results, {
+                    "type": issue_type,
+                    "severity": IssueSeverity.MINOR,
+                    "message": f"Avoid '{term}' in {section_name}",
+                    "location": section_name,
+                    "suggestion": suggestion
+                })
 
     def _create_validity_issue(self, requirement: str, validity_type: str, 
-                             severity: str, study_type: str) -> Dict:
+                             severity: IssueSeverity, recommendations: Dict) -> Dict:
         """Create a validity issue with appropriate recommendation"""
-        recommendations = self._get_validity_recommendations(study_type)
         rec = recommendations.get(requirement, {})
 
         return {
             "type": IssueType.METHODOLOGY,
-            "severity": IssueSeverity.CRITICAL if severity == "critical" else IssueSeverity.MAJOR,
+            "severity": severity,
             "message": rec.get("message", f"Missing {validity_type} validity requirement: {requirement}"),
             "location": "methods",
             "suggestion": rec.get("recommendation", f"Add details about {requirement}")
         }
 
+    def _add_issue(self, results: Dict, issue: Dict):
+        """Record an issue, bucketing it by severity for scoring and reporting"""
+        results["issues"].append(issue)
+        results["issues_by_severity"][issue["severity"]].append(issue)
+
     def _calculate_quality_score(self, results: Dict) -> float:
         """Calculate overall quality score based on validation results"""
-        critical_issues = len([i for i in results["issues"] 
-                             if i["severity"] == IssueSeverity.CRITICAL])
-        major_issues = len([i for i in results["issues"] 
-                          if i["severity"] == IssueSeverity.MAJOR])
+        critical_issues = len(results["issues_by_severity"][IssueSeverity.CRITICAL])
+        major_issues = len(results["issues_by_severity"][IssueSeverity.MAJOR])
 
         base_score = 100
         critical_penalty = critical_issues * 15
@@ -296,8 +375,7 @@ class ProtocolValidator:
         report.append(f"Overall Quality Score: {validation_results['quality_score']:.2f}%\n")
 
         # Critical issues
-        critical_issues = [i for i in validation_results["issues"] 
-                         if i["severity"] == IssueSeverity.CRITICAL]
+        critical_issues = validation_results["issues_by_severity"][IssueSeverity.CRITICAL]
         if critical_issues:
             report.append("\n🚫 Critical Issues:")
             for issue in critical_issues:
@@ -306,8 +384,7 @@ class ProtocolValidator:
                     report.append(f"  Suggestion: {issue['suggestion']}")
 
         # Major issues
-        major_issues = [i for i in validation_results["issues"] 
-                       if i["severity"] == IssueSeverity.MAJOR]
+        major_issues = validation_results["issues_by_severity"][IssueSeverity.MAJOR]
         if major_issues:
             report.append("\n⚠️ Major Issues:")
             for issue in major_issues:
@@ -354,4 +431,4 @@ class ProtocolValidator:
 
     def _get_validity_recommendations(self, study_type: str) -> Dict:
         # Implement recommendations lookup
-        return {}
\ No newline at end of file
+        return {}
@@ -1,74 +1,37 @@
-COMPREHENSIVE_STUDY_CONFIGS = {
+from types import MappingProxyType
+
+# Section order shared by every clinical trial phase
+CLINICAL_TRIAL_SECTIONS = (
+    'title',
+    'synopsis',
+    'background',
+    'objectives',
+    'study_design',
+    'population',
+    'procedures',
+    'statistical_analysis',
+    'safety',
+    'endpoints',
+    'ethical_considerations',
+    'data_monitoring',
+    'completion_criteria'
+)
+
+_STUDY_CONFIGS = {
     'phase1': {
-        'required_sections': [
-            'title',
-            'synopsis',
-            'background',
-            'objectives',
-            'study_design',
-            'population',
-            'procedures',
-            'statistical_analysis',
-            'safety',
-            'endpoints',
-            'ethical_considerations',
-            'data_monitoring',
-            'completion_criteria'
-        ]
+        'required_sections': CLINICAL_TRIAL_SECTIONS
     },
     'phase2': {
-        'required_sections': [
-            'title',
-            'synopsis',
-            'background',
-            'objectives',
-            'study_design',
-            'population',
-            'procedures',
-            'statistical_analysis',
-            'safety',
-            'endpoints',
-            'ethical_considerations',
-            'data_monitoring',
-            'completion_criteria'
-        ]
+        'required_sections': CLINICAL_TRIAL_SECTIONS
     },
     'phase3': {
-        'required_sections': [
-            'title',
-            'synopsis',
-            'background',
-            'objectives',
-            'study_design',
-            'population',
-            'procedures',
-            'statistical_analysis',
-            'safety',
-            'endpoints',
-            'ethical_considerations',
-            'data_monitoring',
-            'completion_criteria'
-        ]
+        'required_sections': CLINICAL_TRIAL_SECTIONS
     },
     'phase4': {
-        'required_sections': [
-            'title',
-            'synopsis',
-            'background',
-            'objectives',
-            'study_design',
-            'population',
-            'procedures',
-            'statistical_analysis',
-            'safety',
-            'endpoints',
-            'ethical_considerations',
-            'data_monitoring',
-            'completion_criteria'
-        ]
+        'required_sections': CLINICAL_TRIAL_SECTIONS
     },
     'observational': {
-        'required_sections': [
+        'required_sections': (
             'title',
             'synopsis',
             'background',
@@ -80,10 +43,10 @@ COMPREHENSIVE_STUDY_CONFIGS = {
             'ethical_considerations',
             'data_monitoring',
             'completion_criteria'
-        ]
+        )
     },
     'systematic_review': {
-        'required_sections': [
+        'required_sections': (
             'title',
             'synopsis',
             'background',
@@ -94,10 +57,10 @@ COMPREHENSIVE_STUDY_CONFIGS = {
             'synthesis_methods',
             'results_reporting',
             'ethical_considerations'
-        ]
+        )
     },
     'secondary_rwe': {
-        'required_sections': [
+        'required_sections': (
             'title',
             'synopsis',
             'background',
@@ -107,10 +70,10 @@ COMPREHENSIVE_STUDY_CONFIGS = {
             'statistical_analysis',
             'limitations',
             'ethical_considerations'
-        ]
+        )
     },
     'patient_survey': {
-        'required_sections': [
+        'required_sections': (
             'title',
             'synopsis',
             'background',
@@ -121,6 +84,12 @@ COMPREHENSIVE_STUDY_CONFIGS = {
             'data_collection',
             'statistical_analysis',
             'ethical_considerations'
-        ]
+        )
     }
 }
+
+# Read-only view shared by every caller; section lists are tuples
+COMPREHENSIVE_STUDY_CONFIGS = MappingProxyType({
+    study_type: MappingProxyType(config)
+    for study_type, config in _STUDY_CONFIGS.items()
+})
@@ -3,6 +3,37 @@ from components.navigator import render_navigator
 from components.editor import render_editor
 from components.input_section import render_input_section
 
+# Static styling to hide debug elements and improve UI
+_APP_CSS = """
+    <style>
+    .stDebug {
+        display: none !important;
+    }
+    .element-container div[data-testid="stDebugElement"] {
+        display: none !important;
+    }
+    .stButton > button {
+        background-color: #4CAF50;
+        color: white;
+        font-weight: bold;
+        padding: 0.75rem;
+        border-radius: 10px;
+        margin: 10px 0;
+        width: 100%;
+    }
+    .main-content {
+        padding: 2rem;
+        max-width: 1200px;
+        margin: 0 auto;
+    }
+    .section-header {
+        color: #2c3e50;
+        font-size: 1.8rem;
+        margin-bottom: 1rem;
+    }
+    </style>
+"""
+
 def main():
     st.set_page_config(
         page_title="Protocol Development Assistant",
@@ -10,36 +41,8 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Add styling to hide debug elements and improve UI
-    st.markdown("""
-        <style>
-        .stDebug {
-            display: none !important;
-        }
-        .element-container div[data-testid="stDebugElement"] {
-            display: none !important;
-        }
-        .stButton > button {
-            background-color: #4CAF50;
-            color: white;
-            font-weight: bold;
-            padding: 0.75rem;
-            border-radius: 10px;
-            margin: 10px 0;
-            width: 100%;
-        }
-        .main-content {
-            padding: 2rem;
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .section-header {
-            color: #2c3e50;
-            font-size: 1.8rem;
-            margin-bottom: 1rem;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    # Add styling
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
 
     # Initialize session state
     if 'study_type' not in st.session_state:
@@ -61,5 +64,7 @@ def main():
         else:
             render_editor()
 
+# Load-bearing: export workers (components/navigator.py) re-import this
+# script as __mp_main__, and must not run the app when they do
 if __name__ == "__main__":
     main()
@@ -0,0 +1,28 @@
+import logging
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from utils import docx_generator
+from utils.docx_generator import generate_docx
+
+SECTIONS = {'study_design': 'Randomized *double-blind* design.'}
+
+class ChangedContentTypesItem:
+    '''Stands in for a python-docx release whose private API has changed'''
+    @staticmethod
+    def from_parts(parts, extra):
+        raise AssertionError('not reached: the signature no longer matches')
+
+def section_text(docx_bytes):
+    return [p.text for p in Document(BytesIO(docx_bytes)).paragraphs]
+
+@pytest.mark.parametrize('content_types_item', [None, ChangedContentTypesItem])
+def test_falls_back_to_document_save(monkeypatch, caplog, content_types_item):
+    expected = section_text(generate_docx(SECTIONS))
+    monkeypatch.setattr(docx_generator, '_ContentTypesItem', content_types_item)
+    with caplog.at_level(logging.WARNING, logger=docx_generator.__name__):
+        assert section_text(generate_docx(SECTIONS)) == expected
+    if content_types_item is not None:
+        assert 'Fast DOCX save failed' in caplog.text
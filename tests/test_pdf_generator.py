@@ -0,0 +1,32 @@
+import random
+
+from utils.pdf_generator import CustomPDF, ProtocolPDFGenerator
+from utils.protocol_text import format_section_title
+
+def test_toc_page_numbers_match_title_pages(monkeypatch):
+    rng = random.Random(7)
+    sections = {
+        f'section_{i}': '\n'.join('word ' * rng.randint(5, 40) for _ in range(rng.randint(1, 12)))
+        for i in range(40)
+    }
+    titles = {format_section_title(name) for name in sections}
+    title_pages = {}
+    original_cell = CustomPDF.cell
+
+    def record_cell(self, w=None, h=None, text='', *args, **kwargs):
+        result = original_cell(self, w, h, text, *args, **kwargs)
+        # Read the page after drawing, as the cell itself may break the page
+        if text in titles and not self.in_toc_rendering:
+            title_pages[text] = self.page
+        return result
+
+    monkeypatch.setattr(CustomPDF, 'cell', record_cell)
+    generator = ProtocolPDFGenerator()
+    generator.generate_pdf(sections)
+
+    toc_pages = {section.name: section.page_number for section in generator.pdf._outline}
+    assert toc_pages == title_pages
+
+def test_toc_spanning_several_pages():
+    for count in (28, 29, 40, 59, 89):
+        ProtocolPDFGenerator().generate_pdf({f'section_{i}': 'text' for i in range(count)})
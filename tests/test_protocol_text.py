@@ -0,0 +1,37 @@
+from io import BytesIO
+
+from docx import Document
+
+from utils.docx_generator import generate_docx
+from utils.pdf_generator import CustomPDF, ProtocolPDFGenerator
+from utils.protocol_text import parse_paragraphs
+
+SENTENCE = 'The **primary endpoint** is *overall survival* at 12 months.'
+
+def test_markers_mid_sentence_keep_spacing():
+    assert parse_paragraphs(SENTENCE) == ((
+        ('The primary endpoint is ', False),
+        ('overall survival', True),
+        (' at 12 months.', False),
+    ),)
+
+def test_space_between_adjacent_italic_runs_is_kept():
+    assert parse_paragraphs('  *a* *b*  ') == ((('a', True), (' ', False), ('b', True)),)
+
+def test_docx_renders_sentence_text():
+    doc = Document(BytesIO(generate_docx({'study_design': SENTENCE})))
+    paragraph = next(p for p in doc.paragraphs if 'endpoint' in p.text)
+    assert paragraph.text == 'The primary endpoint is overall survival at 12 months.'
+    assert [run.italic for run in paragraph.runs] == [None, True, None]
+
+def test_pdf_renders_sentence_text(monkeypatch):
+    written = []
+    original_write = CustomPDF.write
+
+    def record_write(self, h, text, *args, **kwargs):
+        written.append(text)
+        return original_write(self, h, text, *args, **kwargs)
+
+    monkeypatch.setattr(CustomPDF, 'write', record_write)
+    ProtocolPDFGenerator().generate_pdf({'study_design': SENTENCE})
+    assert ''.join(written) == 'The primary endpoint is overall survival at 12 months.'
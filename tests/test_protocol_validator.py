@@ -0,0 +1,44 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+VALIDATOR_PATH = Path(__file__).resolve().parent.parent / 'comprehensive-protocol-validator.py'
+
+@pytest.fixture(scope='module')
+def validator_module():
+    # The module file name is not importable by name
+    spec = importlib.util.spec_from_file_location('comprehensive_protocol_validator', VALIDATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+SAMPLE = {'safety': 'We basically look at many adverse events.'}
+
+def test_repeated_validation_returns_equal_copies(validator_module):
+    validator = validator_module.ProtocolValidator()
+    first = validator.validate_protocol(SAMPLE, 'phase1')
+    second = validator.validate_protocol(SAMPLE, 'phase1')
+    assert second == first
+    assert second is not first
+
+def test_cached_result_unaffected_by_caller_mutation(validator_module):
+    validator = validator_module.ProtocolValidator()
+    first = validator.validate_protocol(SAMPLE, 'phase1')
+    expected = validator.validate_protocol(SAMPLE, 'phase1')
+    first['issues'].clear()
+    first['quality_score'] = -1
+    assert validator.validate_protocol(SAMPLE, 'phase1') == expected
+
+def test_language_suggestions(validator_module):
+    validator = validator_module.ProtocolValidator()
+    results = validator.validate_protocol(SAMPLE, 'phase1')
+    suggestions = {
+        issue['message']: issue['suggestion']
+        for issue in results['issues'] if issue['location'] == 'safety'
+    }
+    assert suggestions == {
+        "Avoid 'basically' in safety": 'Use formal scientific language',
+        "Avoid 'look at' in safety": "Replace with 'examine'",
+        "Avoid 'many' in safety": "'many': specify number",
+    }
@@ -0,0 +1,42 @@
+import logging
+import os
+import tempfile
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+def write_atomic(path: str, data: bytes) -> None:
+    '''Write data to path through a uniquely named temp file in the same directory
+
+    Concurrent writers of the same path each rename a complete file into place,
+    so readers never see a partial one.
+    '''
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+def prune_cache(directory: str, keep: Callable[[os.DirEntry], bool]) -> None:
+    '''Delete files in directory for which keep(entry) is false
+
+    Pruning is best effort: errors are logged and never raised to the caller.
+    '''
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and not keep(entry):
+                os.unlink(entry.path)
+        except OSError as e:
+            logger.warning("Could not prune cache file %s: %s", entry.path, e)
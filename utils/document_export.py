@@ -0,0 +1,51 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from utils.disk_cache import prune_cache, write_atomic
+from utils.docx_generator import generate_docx
+from utils.pdf_generator import ProtocolPDFGenerator
+
+logger = logging.getLogger(__name__)
+
+# Built protocol documents persisted across sessions
+ARTIFACT_CACHE_DIR = '.cache'
+
+def sections_key(sections):
+    '''Stable hash identifying the documents built from these sections today'''
+    # Documents carry the generation date, so the day is part of the key
+    payload = json.dumps([time.strftime("%Y-%m-%d"), sections], sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def build_cached_artifact(kind, sections, builder):
+    '''Return document bytes from the disk cache, building and storing them on a miss'''
+    # The date prefix lets earlier days' documents, which can never be hit again, be pruned
+    prefix = f'protocol_{time.strftime("%Y-%m-%d")}_'
+    path = os.path.join(ARTIFACT_CACHE_DIR, f'{prefix}{sections_key(sections)}.{kind}')
+    
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    data = builder(sections)
+    try:
+        write_atomic(path, data)
+    except OSError as e:
+        # A failed cache write must not block the download
+        logger.warning('Could not cache %s artifact: %s', kind, e)
+    prune_cache(
+        ARTIFACT_CACHE_DIR,
+        lambda entry: not entry.name.startswith('protocol_') or entry.name.startswith(prefix)
+    )
+    return data
+
+def generate_pdf(sections):
+    '''Generate PDF document; each build needs a fresh generator'''
+    return ProtocolPDFGenerator().generate_pdf(sections)
+
+# Builders per document kind, keyed like the navigator's EXPORT_FORMATS
+EXPORT_BUILDERS = {
+    'docx': generate_docx,
+    'pdf': generate_pdf
+}
@@ -0,0 +1,196 @@
+import logging
+import re
+import time
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZIP_DEFLATED
+from docx import Document
+from docx.shared import Pt
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+try:
+    # Private helper; save_docx_fast falls back to Document.save without it
+    from docx.opc.pkgwriter import _ContentTypesItem
+except ImportError:
+    _ContentTypesItem = None
+from utils.protocol_text import parse_paragraphs, format_section_title, to_ascii_punctuation
+
+logger = logging.getLogger(__name__)
+
+# zlib level for DOCX parts; level 1 is several times faster than the default 6
+# for a slightly larger download
+DOCX_COMPRESSLEVEL = 1
+
+# OOXML run template; italic runs carry <w:i/>, plain runs inherit the Normal style
+RUN_XML = '<w:r>{properties}<w:t xml:space="preserve">{text}</w:t></w:r>'
+ITALIC_PROPERTIES = '<w:rPr><w:i/></w:rPr>'
+RUN_TEXT_ESCAPES = {
+    '\t': '</w:t><w:tab/><w:t xml:space="preserve">',
+    '\r': '</w:t><w:br/><w:t xml:space="preserve">'
+}
+
+def paragraph_xml(runs):
+    '''Serialize one paragraph's runs to a <w:p> element, mirroring add_paragraph/add_run output'''
+    runs_xml = ''.join(
+        RUN_XML.format(
+            properties=ITALIC_PROPERTIES if italic else '',
+            text=escape(part, RUN_TEXT_ESCAPES)
+        )
+        for part, italic in runs
+    )
+    return f'<w:p>{runs_xml}</w:p>'
+
+@lru_cache(maxsize=1)
+def get_docx_template():
+    '''Serialized document prefix (styles and title) shared by every export'''
+    doc = Document()
+    
+    # Body font is set once on the Normal style so runs inherit it
+    normal = doc.styles['Normal']
+    normal.font.name = 'Calibri'
+    normal.font.size = Pt(11)
+    
+    # Add title with proper encoding
+    title = doc.add_heading('Study Protocol', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Kept as bytes: a deep-copied Document saves its original parts, not the copy
+    template_bytes = BytesIO()
+    doc.save(template_bytes)
+    return template_bytes.getvalue()
+
+def generate_docx(sections):
+    '''Generate DOCX document with enhanced formatting'''
+    doc = Document(BytesIO(get_docx_template()))
+    titles = {name: format_section_title(name) for name in sections}
+    
+    # Add date with proper encoding
+    date_para = doc.add_paragraph()
+    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    date_para.add_run(time.strftime("%B %d, %Y"))
+    
+    # Add table of contents
+    doc.add_heading('Table of Contents', level=1)
+    for section_name in sections.keys():
+        toc_para = doc.add_paragraph()
+        toc_para.add_run(f'• {titles[section_name]}')
+    
+    doc.add_page_break()
+    
+    # Add sections with proper encoding
+    for section_name, content in sections.items():
+        # Add section heading
+        doc.add_heading(titles[section_name], level=1)
+        
+        # Process content with proper encoding
+        add_text_with_formatting(doc, content)
+        doc.add_page_break()
+    
+    # Save document
+    docx_bytes = BytesIO()
+    save_docx_fast(doc, docx_bytes)
+    return docx_bytes.getvalue()
+
+def save_docx_fast(doc, stream):
+    '''Save a document like Document.save, but with a cheap DEFLATE level'''
+    # Mirrors docx.opc.pkgwriter.PackageWriter.write, which hardcodes the zlib default
+    if _ContentTypesItem is None:
+        doc.save(stream)
+        return
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+    
+    # Build every member first so a python-docx internals change fails
+    # before anything is written to the stream
+    try:
+        members = [
+            (CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob),
+            (PACKAGE_URI.rels_uri.membername, package.rels.xml)
+        ]
+        for part in parts:
+            members.append((part.partname.membername, part.blob))
+            if len(part.rels):
+                members.append((part.partname.rels_uri.membername, part.rels.xml))
+    except Exception as e:
+        # Any change in the private API must cost speed, never the export
+        logger.warning("Fast DOCX save failed (%r); using Document.save", e)
+        doc.save(stream)
+        return
+    
+    with ZipFile(stream, 'w', compression=ZIP_DEFLATED, compresslevel=DOCX_COMPRESSLEVEL) as zipf:
+        for name, data in members:
+            zipf.writestr(name, data)
+
+def add_text_with_formatting(doc, text):
+    '''Add text to document with proper encoding'''
+    try:
+        # Convert text to string if it's bytes
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        
+        # Replace special characters with ASCII equivalents
+        text = to_ascii_punctuation(text)
+        
+        # Handle HTML tables
+        if '<table' in text:
+            parts = text.split('<table')
+            
+            # Add text before first table
+            if parts[0].strip():
+                add_paragraphs_with_formatting(doc, parts[0])
+            
+            # Process each table
+            for part in parts[1:]:
+                table_end = part.find('</table>')
+                if table_end != -1:
+                    table_html = '<table' + part[:table_end + 8]
+                    remaining_text = part[table_end + 8:]
+                    
+                    # Convert HTML table to Word table
+                    rows = re.findall(r'<tr>(.*?)</tr>', table_html, re.DOTALL)
+                    if rows:
+                        # Count columns from first row
+                        first_row_cells = re.findall(r'<t[hd]>(.*?)</t[hd]>', rows[0])
+                        table = doc.add_table(rows=len(rows), cols=len(first_row_cells))
+                        table.style = 'Table Grid'
+                        
+                        # Fill table
+                        for i, row in enumerate(rows):
+                            cells = re.findall(r'<t[hd]>(.*?)</t[hd]>', row)
+                            for j, cell_content in enumerate(cells):
+                                clean_content = to_ascii_punctuation(cell_content.strip())
+                                table.cell(i, j).text = clean_content
+                                if i == 0:
+                                    table.cell(i, j).paragraphs[0].runs[0].bold = True
+                    
+                    # Add remaining text
+                    if remaining_text.strip():
+                        add_paragraphs_with_formatting(doc, remaining_text)
+        else:
+            add_paragraphs_with_formatting(doc, text)
+    except Exception as e:
+        logger.error("Error in add_text_with_formatting: %s", e)
+        raise
+
+def add_paragraphs_with_formatting(doc, text):
+    '''Add paragraphs with proper encoding'''
+    try:
+        # Convert text to string if it's bytes
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+            
+        # Build all paragraphs as one OOXML fragment and parse it in a single pass
+        paragraphs_xml = ''.join(map(paragraph_xml, parse_paragraphs(text)))
+        if paragraphs_xml:
+            fragment = parse_xml(f'<w:body {nsdecls("w")}>{paragraphs_xml}</w:body>')
+            body = doc.element.body
+            for p in list(fragment):
+                body._insert_p(p)  # Keeps paragraphs ahead of the trailing sectPr
+    except Exception as e:
+        logger.error("Error in add_paragraphs_with_formatting: %s", e)
+        raise
@@ -5,6 +5,11 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Completion settings; part of the generated-section cache key
+MODEL = "gpt-4o-2024-08-06"
+TEMPERATURE = 0.3
+MAX_TOKENS = 3000
+
 class GPTHandler:
     def __init__(self):
         try:
@@ -16,7 +21,7 @@ class GPTHandler:
             
             # Test connection with a simple completion
             test_response = self.client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
+                model=MODEL,
                 messages=[{"role": "user", "content": "test"}],
                 max_tokens=5
             )
@@ -85,10 +90,10 @@ class GPTHandler:
             
             logger.info("Sending request to OpenAI API")
             response = self.client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
+                model=MODEL,
                 messages=messages,
-                temperature=0.3,
-                max_tokens=3000
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS
             )
             
             if not response.choices:
@@ -1,32 +1,138 @@
 import logging
+import os
+import subprocess
+import fpdf
 from fpdf import FPDF
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from utils.protocol_text import parse_protocol, to_latin1
 import time
 
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Legacy PyFPDF builds output with str concatenation (quadratic in page count);
+# fpdf2 shares the module name but buffers into a bytearray
+if int(fpdf.__version__.split('.')[0]) < 2:
+    raise ImportError(f"fpdf2 is required, found legacy fpdf {fpdf.__version__}")
+
+# Core font; it only covers latin-1, so it is the fallback and text is
+# transliterated for it. 'Arial' is only a deprecated alias of it in fpdf2
+FALLBACK_FONT = 'Helvetica'
+
+# Unicode TrueType families tried in order, as fontconfig family names
+UNICODE_FONT_FAMILIES = ('DejaVu Sans', 'FreeSans')
+
+# fontconfig style for each fpdf style the generator uses
+FONTCONFIG_STYLES = {'': 'regular', 'B': 'bold', 'I': 'italic'}
+
+# Used when fontconfig is not installed: family, directories, file per style.
+# DejaVu comes from fonts-dejavu-core (Debian/Ubuntu) or dejavu-sans-fonts
+# (Fedora); FreeSans from fonts-freefont-ttf (Debian/Ubuntu) or the Nix
+# freefont_ttf package listed in replit.nix
+UNICODE_FONT_CANDIDATES = (
+    ('DejaVu', ('/usr/share/fonts/truetype/dejavu', '/usr/share/fonts/dejavu-sans-fonts'),
+     {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf', 'I': 'DejaVuSans-Oblique.ttf'}),
+    ('FreeSans', ('/usr/share/fonts/truetype/freefont', os.path.expanduser('~/.nix-profile/share/fonts/truetype')),
+     {'': 'FreeSans.ttf', 'B': 'FreeSansBold.ttf', 'I': 'FreeSansOblique.ttf'}),
+)
+
+def match_font_file(family: str, style: str) -> Optional[str]:
+    '''Path fontconfig resolves for family and style, or None if it substitutes another family'''
+    try:
+        result = subprocess.run(
+            ['fc-match', '--format=%{family}\n%{file}', f'{family}:{style}'],
+            capture_output=True, text=True, timeout=10, check=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    families, _, path = result.stdout.partition('\n')
+    if family not in families.split(',') or not path.lower().endswith('.ttf'):
+        return None
+    return path
+
+def find_fontconfig_font() -> Optional[Tuple[str, Dict[str, str]]]:
+    '''First Unicode family fontconfig has a distinct file for in every style'''
+    for family in UNICODE_FONT_FAMILIES:
+        paths = {style: match_font_file(family, name) for style, name in FONTCONFIG_STYLES.items()}
+        # fontconfig falls back to the regular face for a missing style
+        if all(paths.values()) and len(set(paths.values())) == len(paths):
+            return family.replace(' ', ''), paths
+    return None
+
+@lru_cache(maxsize=1)
+def resolve_unicode_font() -> Optional[Tuple[str, Dict[str, str]]]:
+    '''Find an installed Unicode font once per process
+
+    Returns (family, {style: path}) or None when no candidate is complete.
+    '''
+    if unicode_font := find_fontconfig_font():
+        return unicode_font
+    for family, directories, files in UNICODE_FONT_CANDIDATES:
+        for directory in directories:
+            paths = {style: os.path.join(directory, name) for style, name in files.items()}
+            if all(os.path.isfile(path) for path in paths.values()):
+                return family, paths
+    logger.warning("No Unicode TrueType font found; PDF export falls back to %s (latin-1 only)", FALLBACK_FONT)
+    return None
+
 class CustomPDF(FPDF):
     def __init__(self):
         super().__init__()
         self.set_auto_page_break(auto=True, margin=35)  # Set margin for page breaks
-        # Use standard font instead of custom Unicode font
-        self.set_font('Arial', '', 12)
+        # Embed a Unicode font when one is installed so generated text with
+        # symbols like '≥' or 'µ' renders; otherwise use the core font
+        unicode_font = resolve_unicode_font()
+        if unicode_font:
+            self.body_font, paths = unicode_font
+            for style, path in paths.items():
+                self.add_font(self.body_font, style, path)
+            self.prepare_text = str
+        else:
+            # Typographic punctuation becomes ASCII, anything else non-latin-1 becomes '?'
+            self.body_font = FALLBACK_FONT
+            self.prepare_text = to_latin1
+        self.set_font(self.body_font, '', 12)
+        # Footer text is identical on every page, so build it once
+        self.footer_text = f'Generated: {time.strftime("%B %d, %Y")}'
 
     def header(self):
         # Header with page number
         self.set_y(10)
-        self.set_font('Arial', 'I', 8)
-        header_text = f'Protocol - Page {self.page_no()}'
-        self.cell(0, 10, header_text, 0, 0, 'R')
+        self.set_font(self.body_font, 'I', 8)
+        # {nb} is fpdf2's total-pages alias, substituted once at output time
+        header_text = f'Protocol - Page {self.page_no()} of {{nb}}'
+        self.cell(0, 10, header_text, 0, 1, 'R')
 
     def footer(self):
         # Footer with generation date
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        date_str = time.strftime("%B %d, %Y")
-        footer_text = f'Generated: {date_str}'
-        self.cell(0, 10, footer_text, 0, 0, 'C')
+        self.set_font(self.body_font, 'I', 8)
+        self.cell(0, 10, self.footer_text, 0, 0, 'C')
+
+# Table of contents layout: heading block height and height of each entry line
+TOC_HEADING_HEIGHT = 15
+TOC_LINE_HEIGHT = 8
+
+def toc_page_count(pdf: FPDF, entries: int) -> int:
+    '''Pages render_toc needs for the given number of entries, starting at the current y'''
+    first_page = int((pdf.page_break_trigger - pdf.get_y() - TOC_HEADING_HEIGHT) // TOC_LINE_HEIGHT)
+    # fpdf2 continues the ToC on the reserved pages at the top margin, since
+    # their headers were already drawn when the pages were reserved
+    per_page = int((pdf.page_break_trigger - pdf.t_margin) // TOC_LINE_HEIGHT)
+    remaining = max(0, entries - first_page)
+    return 1 + -(-remaining // per_page)
+
+def render_toc(pdf: FPDF, outline) -> None:
+    '''Draw the table of contents once content pagination is known'''
+    pdf.set_font(pdf.body_font, 'B', 12)
+    pdf.cell(0, 10, 'Table of Contents', ln=True)
+    pdf.ln(TOC_HEADING_HEIGHT - 10)
+    pdf.set_font(pdf.body_font, '', 10)
+    for section in outline:
+        link = pdf.add_link(page=section.page_number)
+        pdf.cell(170, TOC_LINE_HEIGHT, section.name, link=link)
+        pdf.cell(0, TOC_LINE_HEIGHT, str(section.page_number), ln=True, align='R', link=link)
 
 class ProtocolPDFGenerator:
     def __init__(self):
@@ -34,22 +140,41 @@ class ProtocolPDFGenerator:
 
     def generate_pdf(self, sections: Dict[str, str]) -> bytes:
         try:
+            # Reserve the table of contents; fpdf2 renders it from the outline
+            # after the content is laid out, so page numbers are exact. It must
+            # span exactly the reserved pages, one entry per section
             self.pdf.add_page()
+            self.pdf.insert_toc_placeholder(render_toc, pages=toc_page_count(self.pdf, len(sections)))
 
-            # Add content sections
-            for section_name, content in sections.items():
-                # Add section title
-                self.pdf.set_font('Arial', 'B', 12)
-                self.pdf.cell(0, 10, section_name.replace('_', ' ').title(), ln=True)
+            # Add content sections from the shared tokenized form
+            prepare_text = self.pdf.prepare_text
+            for section_title, paragraphs in parse_protocol(sections):
+                section_title = prepare_text(section_title)
+                # Add section title; the outline entry records its real page,
+                # so break first if the title block would not fit on this one
+                self.pdf.set_font(self.pdf.body_font, 'B', 12)
+                if self.pdf.will_page_break(15):
+                    self.pdf.add_page()
+                self.pdf.start_section(section_title)
+                self.pdf.cell(0, 10, section_title, ln=True)
                 self.pdf.ln(5)  # Space between title and content
 
-                # Add section content
-                self.pdf.set_font('Arial', '', 10)
-                self.pdf.multi_cell(0, 10, content)
+                # Add section content, flowing italic runs inline and only
+                # switching fonts when the run style changes
+                current_style = ''
+                self.pdf.set_font(self.pdf.body_font, current_style, 10)
+                for runs in paragraphs:
+                    for text, italic in runs:
+                        style = 'I' if italic else ''
+                        if style != current_style:
+                            self.pdf.set_font(self.pdf.body_font, style, 10)
+                            current_style = style
+                        self.pdf.write(10, prepare_text(text))
+                    self.pdf.ln(10)
                 self.pdf.ln(10)  # Space between sections
 
             # Return PDF bytes
             return bytes(self.pdf.output())
         except Exception as e:
-            logger.error(f"Error generating PDF: {str(e)}")
+            logger.error("Error generating PDF: %s", e)
             raise
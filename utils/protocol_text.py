@@ -0,0 +1,79 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+# A run is a piece of paragraph text and whether it is italic
+Run = Tuple[str, bool]
+
+# Typographic characters and their plain-text equivalents
+ASCII_REPLACEMENTS = str.maketrans({
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+    '•': '-',
+    '–': '-',
+    '—': '-',
+    '…': '...',
+    '°': ' degrees ',
+    '±': '+/-',
+    '×': 'x',
+    '÷': '/',
+    '≥': '>=',
+    '≤': '<=',
+    '≈': '~',
+    '≠': '!='
+})
+
+# Matches non-blank lines, so empty paragraphs are skipped by the regex engine
+PARAGRAPH_PATTERN = re.compile(r'[^\n]*\S[^\n]*')
+
+def to_ascii_punctuation(text: str) -> str:
+    """Replace typographic characters with their plain-text equivalents"""
+    return text.translate(ASCII_REPLACEMENTS)
+
+def to_latin1(text: str) -> str:
+    """Text safe for latin-1 only fonts; anything else left over becomes '?'"""
+    return to_ascii_punctuation(text).encode('latin-1', 'replace').decode('latin-1')
+
+def iter_runs(para: str) -> Iterator[Run]:
+    """Yield (text, italic) runs of a paragraph, where *asterisks* toggle italics
+
+    Spacing between runs is kept as written; only the paragraph's ends are trimmed.
+    """
+    # Adjacent parts with the same style (e.g. around '**') are merged into one run
+    runs: List[Run] = []
+    for i, part in enumerate(para.split('*')):
+        if part:
+            italic = bool(i % 2)  # Odd indices are italic
+            if runs and runs[-1][1] == italic:
+                runs[-1] = (runs[-1][0] + part, italic)
+            else:
+                runs.append((part, italic))
+    if runs:
+        runs[0] = (runs[0][0].lstrip(), runs[0][1])
+        runs[-1] = (runs[-1][0].rstrip(), runs[-1][1])
+    yield from (run for run in runs if run[0])
+
+@lru_cache(maxsize=None)
+def format_section_title(section_name: str) -> str:
+    """Display title for a section key, e.g. 'study_design' -> 'Study Design'"""
+    return section_name.replace('_', ' ').title()
+
+@lru_cache(maxsize=256)
+def parse_paragraphs(text: str) -> Tuple[Tuple[Run, ...], ...]:
+    """Split text into non-blank paragraphs of formatted runs
+
+    Memoized per process, so a re-export handled by the same export worker
+    after editing a single section reuses the tokenized form of the
+    unchanged sections. The DOCX and PDF builds do not share entries: they
+    run in separate workers and tokenize differently prepared text.
+    """
+    return tuple(tuple(iter_runs(match.group())) for match in PARAGRAPH_PATTERN.finditer(text))
+
+def parse_protocol(sections: Dict[str, str]) -> List[Tuple[str, Tuple[Tuple[Run, ...], ...]]]:
+    """Tokenize every section once into (title, paragraphs) for the PDF renderer"""
+    return [
+        (format_section_title(section_name), parse_paragraphs(content))
+        for section_name, content in sections.items()
+    ]
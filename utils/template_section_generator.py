@@ -1,12 +1,22 @@
+import hashlib
 import logging
+import os
+import time
 from typing import Dict, Optional
-from utils.gpt_handler import GPTHandler
+from utils.disk_cache import prune_cache, write_atomic
+from utils.gpt_handler import GPTHandler, MAX_TOKENS, MODEL, TEMPERATURE
 from config.study_type_definitions import COMPREHENSIVE_STUDY_CONFIGS
 from prompts.section_templates import SECTION_TEMPLATES, CONDITIONAL_SECTIONS, DEFAULT_TEMPLATES
 import streamlit as st
 
 logger = logging.getLogger(__name__)
 
+# Generated section text persisted across reloads and server restarts
+SECTION_CACHE_DIR = os.path.join('.cache', 'sections')
+
+# Cached sections older than this are deleted when new ones are written
+SECTION_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
 class TemplateSectionGenerator:
     def __init__(self):
         self.gpt_handler = GPTHandler()
@@ -171,15 +181,18 @@ Then generate Statistical Analysis Plan including:
         # Fall back to default template
         return DEFAULT_TEMPLATES.get(section_name, f"Generate content for {section_name} section")
 
-    def generate_section(self, section_name: str, synopsis_content: str, study_type: str) -> str:
+    def generate_section(self, section_name: str, synopsis_content: str, study_type: str,
+                         previous_sections: Optional[Dict[str, str]] = None,
+                         use_cache: bool = True) -> str:
         try:
-            # Get previously generated sections for context
-            previous_sections = {}
-            if hasattr(st.session_state, 'generated_sections'):
-                previous_sections = {
-                    name: content for name, content in st.session_state.generated_sections.items()
-                    if name != section_name
-                }
+            # Get previously generated sections for context; callers running off the
+            # script thread pass them in since session state is unavailable there
+            if previous_sections is None:
+                previous_sections = getattr(st.session_state, 'generated_sections', {})
+            previous_sections = {
+                name: content for name, content in previous_sections.items()
+                if name != section_name
+            }
             
             # Enhanced system message with study type-specific thinking
             system_message = '''You are a protocol development assistant specializing in clinical study protocols.
@@ -237,12 +250,44 @@ Format using:
             
             prompt = f"{context}Based on this study synopsis:\n{synopsis_content}\n\n{template}"
             
-            return self.gpt_handler.generate_content(prompt=prompt, system_message=system_message)
+            return self.generate_cached_content(prompt, system_message, use_cache=use_cache)
             
         except Exception as e:
-            logger.error(f"Error generating {section_name}: {str(e)}")
+            logger.error("Error generating %s: %s", section_name, e)
             raise
 
+    def generate_cached_content(self, prompt: str, system_message: str, use_cache: bool = True) -> str:
+        """Return content for an identical earlier request from disk, calling the API on a miss
+
+        With use_cache=False the cached draft is ignored and replaced by a fresh one.
+        """
+        # The key covers the full request: completion settings, synopsis, study type
+        # template and previous sections
+        request = f"{MODEL}\0{TEMPERATURE}\0{MAX_TOKENS}\0{system_message}\0{prompt}"
+        key = hashlib.blake2b(request.encode('utf-8'), digest_size=16).hexdigest()
+        path = os.path.join(SECTION_CACHE_DIR, f"{key}.txt")
+        
+        cutoff = time.time() - SECTION_CACHE_MAX_AGE
+        if use_cache:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    if os.fstat(f.fileno()).st_mtime >= cutoff:
+                        return f.read()
+                # Expired drafts are a miss even before the next write prunes them
+                os.unlink(path)
+            except OSError:
+                pass
+        
+        content = self.gpt_handler.generate_content(prompt=prompt, system_message=system_message)
+        if content:
+            try:
+                write_atomic(path, content.encode('utf-8'))
+            except OSError as e:
+                # A read-only filesystem only loses the cache, not the section
+                logger.warning("Could not cache generated section: %s", e)
+            prune_cache(SECTION_CACHE_DIR, lambda entry: entry.stat().st_mtime >= cutoff)
+        return content
+
     def should_include_section(self, section_name: str, study_type: str) -> bool:
         '''Determine if a section should be included based on study type rules'''
         critical_sections = {